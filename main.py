@@ -1,4 +1,6 @@
 # main.py
+import hashlib
+import importlib.util
 import re
 import sys
 import os # For checking spacy model
@@ -15,56 +17,244 @@ from PySide6.QtWidgets import (QApplication, QCheckBox, QComboBox, QFileDialog,
 
 from model import ProjectModel
 
+_NL_RE = re.compile(r'(?:\r\n|\n)+')
+
+# Above this many sentences the all-pairs similarity matrix is not materialized.
+_INT8_GEMM_MAX_SENTS = 4096
+
+# NumPy for the batched severity formula, numba for the optional JIT kernel on
+# top of it; both are best-effort and independent of the lazy semantic stack.
+try:
+    import numpy as _hue_np
+except ImportError:
+    _hue_np = None
+
+_span_hues = None
+if _hue_np is not None:
+    try:
+        from numba import njit as _njit
+    except ImportError:
+        pass
+    else:
+        @_njit(cache=True)
+        def _span_hues(occ_idx, tot, wc):
+            """Computes the heatmap hue for every span (arrays of float64)."""
+            out = _hue_np.empty(occ_idx.shape[0], dtype=_hue_np.float64)
+            for k in range(occ_idx.shape[0]):
+                if tot[k] < 2:
+                    out[k] = 300.0
+                    continue
+                progress = occ_idx[k] / (tot[k] - 1) if tot[k] > 1 else 0.0
+                if wc[k] >= 16:
+                    severity = 1.0
+                else:
+                    if wc[k] <= 2:
+                        max_severity = 0.2
+                    elif wc[k] >= 4:
+                        max_severity = 1.0
+                    else:
+                        max_severity = 0.2 + 0.8 * (wc[k] - 2) / 2
+                    severity = progress * max_severity
+                severity = max(0.0, min(1.0, severity))
+                out[k] = 300.0 - severity * 300.0
+            return out
+
 # --- Dependency Loading ---
+# The semantic stack (spacy/sentence-transformers/faiss/numpy) costs seconds of
+# cold-start time and hundreds of MB of RSS, so it is only probed here with
+# find_spec and actually imported on the first semantic export.
 nlp = None
 SentenceTransformer = None
 faiss = None
 np = None
-SEMANTIC_ENABLED = False
 
-try:
-    import spacy
-    import sentence_transformers
-    import faiss
-    import numpy as np
-    
-    SentenceTransformer = sentence_transformers.SentenceTransformer
-    
-    # Check for SpaCy model
-    if not spacy.util.is_package("en_core_web_sm"):
-        print("SpaCy 'en_core_web_sm' model not found. Please run: python -m spacy download en_core_web_sm")
-    else:
+def _semantic_available():
+    return all(importlib.util.find_spec(m) is not None
+               for m in ("spacy", "sentence_transformers", "faiss", "numpy"))
+
+SEMANTIC_ENABLED = _semantic_available()
+if not SEMANTIC_ENABLED:
+    print("Semantic analysis libraries not installed. Semantic Echo export will be disabled.")
+
+def _load_semantic_modules():
+    """Imports the semantic dependencies on first use. Returns True when ready."""
+    global nlp, SentenceTransformer, faiss, np
+    if nlp is not None:
+        return True
+    try:
+        import spacy
+        import sentence_transformers
+        import faiss as _faiss
+        import numpy as _np
+
+        SentenceTransformer = sentence_transformers.SentenceTransformer
+        faiss = _faiss
+        np = _np
+
+        # Check for SpaCy model
+        if not spacy.util.is_package("en_core_web_sm"):
+            print("SpaCy 'en_core_web_sm' model not found. Please run: python -m spacy download en_core_web_sm")
+            return False
         nlp = spacy.load("en_core_web_sm")
-    
-    # Check if all models/libs are loaded
-    if nlp and SentenceTransformer and faiss and np:
-        SEMANTIC_ENABLED = True
         print("Semantic analysis dependencies loaded successfully.")
+        return True
+    except ImportError as e:
+        print(f"A required library is not installed: {e}. Semantic Echo export will be disabled.")
+    except Exception as e:
+        print(f"An error occurred during dependency loading: {e}. Semantic Echo export will be disabled.")
+    return False
+
+
+# Report template fragments, formatted once at import: the legend colors are
+# constants, so no per-export string formatting is needed.
+_EXPORT_SATURATION = 75
+_EXPORT_LIGHTNESS = 15
+_HTML_HEAD = f"""<!DOCTYPE html>
+<html>
+<head>
+<title>Repetition Heatmap</title>
+<style>
+body {{ font-family: sans-serif; background-color: #333; color: white; }}
+#toggles {{ position: fixed; top: 10px; left: 25%; transform: translateX(-50%); text-align: center; z-index: 10; }}
+#toggles button {{ margin-right: 10px; padding: 5px 10px; cursor: pointer; }}
+.no-colors #semantic-echo-view span, .no-colors #echo-list-view span.echo-highlight {{ background-color: transparent !important; }}
+.echo-highlight {{ padding: 0.1em 0.2em; border-radius: 0.2em; }}
+</style>
+</head>
+<body class="show-colors">
+
+<div id="color-legend" style="margin-bottom: 20px;">
+    <h3>Color Legend: Repetition Level</h3>
+    <div style="display: flex; align-items: center; flex-wrap: wrap;">
+        <span style="background-color: hsl(300, {_EXPORT_SATURATION}%, {_EXPORT_LIGHTNESS}%); width: 30px; height: 30px; display: inline-block; margin-right: 5px; border: 1px solid #555;"></span> Purple: Very Low Repetition   
+        <span style="background-color: hsl(240, {_EXPORT_SATURATION}%, {_EXPORT_LIGHTNESS}%); width: 30px; height: 30px; display: inline-block; margin-right: 5px; border: 1px solid #555;"></span> Blue: Low Repetition   
+        <span style="background-color: hsl(120, {_EXPORT_SATURATION}%, {_EXPORT_LIGHTNESS}%); width: 30px; height: 30px; display: inline-block; margin-right: 5px; border: 1px solid #555;"></span> Green: Moderate Repetition   
+        <span style="background-color: hsl(60 , {_EXPORT_SATURATION}%, {_EXPORT_LIGHTNESS}%); width: 30px; height: 30px; display: inline-block; margin-right: 5px; border: 1px solid #555;"></span> Yellow: High Repetition   
+        <span style="background-color: hsl(0  , {_EXPORT_SATURATION}%, {_EXPORT_LIGHTNESS}%); width: 30px; height: 30px; display: inline-block; margin-right: 5px; border: 1px solid #555;"></span> Red: Very High Repetition (Review)
+    </div>
+</div>
 
-except ImportError as e:
-    print(f"A required library is not installed: {e}. Semantic Echo export will be disabled.")
-except Exception as e:
-    print(f"An error occurred during dependency loading: {e}. Semantic Echo export will be disabled.")
+<div id="toggles">
+    <button id="toggle-view">Semantic Echo View</button>
+    <button id="toggle-colors">Hide Colors</button>
+</div>
+
+<h2 id="semantic-echo-header" style="display: none;">Echo List and Semantic Echo Level Repetition</h2>
+<div id="semantic-echo-view" style="display: none;">
+    """
+_HTML_MID = """
+</div>
+
+<h2 id="echo-list-header">Echo List Level Repetition</h2>
+<div id="echo-list-view" style="display: block;">
+    """
+_HTML_TAIL = """
+</div>
+
+<script>
+    const toggleViewButton = document.getElementById('toggle-view');
+    const toggleColorsButton = document.getElementById('toggle-colors');
+    const semanticEchoView = document.getElementById('semantic-echo-view');
+    const echoListView = document.getElementById('echo-list-view');
+    const semanticEchoHeader = document.getElementById('semantic-echo-header');
+    const echoListHeader = document.getElementById('echo-list-header');
+    let isEchoListView = true;
+    let areColorsVisible = true;
+
+    toggleViewButton.addEventListener('click', function() {
+        isEchoListView = !isEchoListView;
+        if (isEchoListView) {
+            semanticEchoView.style.display = 'none'; semanticEchoHeader.style.display = 'none';
+            echoListView.style.display = 'block'; echoListHeader.style.display = 'block';
+            toggleViewButton.textContent = 'Semantic Echo View';
+        } else {
+            semanticEchoView.style.display = 'block'; semanticEchoHeader.style.display = 'block';
+            echoListView.style.display = 'none'; echoListHeader.style.display = 'none';
+            toggleViewButton.textContent = 'Echo List View';
+        }
+    });
+    toggleColorsButton.addEventListener('click', function() {
+        areColorsVisible = !areColorsVisible;
+        if (areColorsVisible) {
+            document.body.classList.remove('no-colors');
+            toggleColorsButton.textContent = 'Hide Colors';
+        } else {
+            document.body.classList.add('no-colors');
+            toggleColorsButton.textContent = 'Show Colors';
+        }
+    });
+</script>
+</body>
+</html>"""
 
 
 # --- Worker for Semantic Export ---
 class SemanticWorkerSignals(QObject):
     finished = Signal()
     error = Signal(str)
-    result = Signal(str) # Emits the generated HTML string
+    result = Signal(str) # Emits the export filepath once the report is written
     progress = Signal(str)
+    progress_count = Signal(int, int) # (processed, total); formatted UI-side
 
 class SemanticExportWorker(QRunnable):
     """Worker thread for the computationally expensive semantic analysis and HTML generation."""
-    def __init__(self, text_content):
+    def __init__(self, text_content, export_filepath, echo_list_html, html_writer, para_cache=None):
         super().__init__()
         self.text_content = text_content
+        # The worker owns the output file: it streams the report to disk itself
+        # rather than marshaling a multi-MB HTML string back across threads.
+        self.export_filepath = export_filepath
+        self.echo_list_html = echo_list_html
+        self.html_writer = html_writer # MainWindow._iter_combined_html
+        # paragraph digest -> (sentences, unit-norm float32 embeddings); shared with
+        # MainWindow so edit-and-re-export only pays for changed paragraphs.
+        self.para_cache = para_cache if para_cache is not None else {}
         self.signals = SemanticWorkerSignals()
+        self._progress_every = 64 # Throttle cross-thread emissions in the sentence loop
+
+    def _max_past_similarities(self, embeddings):
+        """Returns, per sentence, the max cosine similarity to any earlier sentence.
+
+        For moderate documents the whole similarity matrix is computed in a single
+        int8 GEMM (embeddings are unit-norm, so relative ranking survives the
+        quantization and memory traffic drops 4x vs. float32). Very large documents
+        fall back to an incremental FAISS inner-product search to keep memory O(N*D)
+        instead of O(N^2)."""
+        n_sents = embeddings.shape[0]
+        scores = np.zeros(n_sents, dtype=np.float32)
+        if n_sents <= _INT8_GEMM_MAX_SENTS:
+            q = np.round(embeddings * 127.0).astype(np.int8)
+            sims = (q.astype(np.int32) @ q.T.astype(np.int32)).astype(np.float32) * (1.0 / (127 * 127))
+            for i in range(1, n_sents):
+                scores[i] = sims[i, :i].max()
+            return scores
+
+        # Unit-norm vectors + inner-product index = exact cosine similarity,
+        # so no L2-to-cosine approximation is needed. The index is built once
+        # and grows with each processed sentence.
+        index = faiss.IndexFlatIP(embeddings.shape[1])
+        try:
+            # faiss-gpu only; falls through to the CPU index otherwise.
+            res = faiss.StandardGpuResources()
+            index = faiss.index_cpu_to_gpu(res, 0, index)
+        except (AttributeError, RuntimeError):
+            pass
+        for i in range(n_sents):
+            if i % self._progress_every == 0:
+                self.signals.progress_count.emit(i, n_sents)
+            if i > 0:
+                D, I = index.search(embeddings[i:i+1], 1) # Search for 1 nearest neighbor
+                scores[i] = float(D[0][0])
+            index.add(embeddings[i:i+1])
+        return scores
 
     @Slot()
     def run(self):
         try:
             self.signals.progress.emit("Initializing semantic models...")
+            if not _load_semantic_modules():
+                self.signals.error.emit("Semantic analysis dependencies could not be loaded.")
+                return
             # Initialize models inside the thread for thread-safety if needed, though SentenceTransformer is generally safe.
             embedder = SentenceTransformer('all-MiniLM-L6-v2')
             saturation = 75
@@ -77,45 +267,57 @@ class SemanticExportWorker(QRunnable):
 
             self.signals.progress.emit("Splitting text into sentences...")
             paragraphs = self.text_content.strip().split("\n\n")
-            
-            sentence_embeddings = []
-            sentence_html_colored = ""
+            digests = [hashlib.blake2b(p.encode('utf-8'), digest_size=8).digest() for p in paragraphs]
+
+            # Sentence-split only paragraphs whose digest is not cached from a prior export.
+            miss_indices = [i for i, d in enumerate(digests) if d not in self.para_cache]
+            para_sents = [self.para_cache[d][0] if d in self.para_cache
+                          else [sent.text for sent in nlp(p).sents]
+                          for p, d in zip(paragraphs, digests)]
 
             self.signals.progress.emit("Generating embeddings (this may take a while)...")
-            all_sents = [sent.text for p in paragraphs for sent in nlp(p).sents]
-            all_embeddings = embedder.encode(all_sents, convert_to_tensor=False)
+            miss_sents = [s for i in miss_indices for s in para_sents[i]]
+            if miss_sents:
+                miss_embeddings = embedder.encode(miss_sents, convert_to_tensor=False,
+                                                  normalize_embeddings=True)
+                pos = 0
+                for i in miss_indices:
+                    k = len(para_sents[i])
+                    emb = np.ascontiguousarray(miss_embeddings[pos:pos + k], dtype=np.float32) if k else None
+                    self.para_cache[digests[i]] = (para_sents[i], emb)
+                    pos += k
+            else:
+                for i in miss_indices:
+                    self.para_cache[digests[i]] = (para_sents[i], None)
+
+            all_sents = [s for sents in para_sents for s in sents]
+            # One contiguous float32 matrix in document order; slices of it are views,
+            # so no per-sentence O(i*D) copy of the embedding history is ever made.
+            para_embs = [self.para_cache[d][1] for d in digests if self.para_cache[d][1] is not None]
+            embeddings = np.vstack(para_embs) if para_embs else np.zeros((0, 1), dtype=np.float32)
+
+            # Drop cache entries for paragraphs no longer present in the document.
+            for stale in set(self.para_cache) - set(digests):
+                del self.para_cache[stale]
 
             self.signals.progress.emit("Calculating similarities...")
-            for i, (sent_text, sent_embedding) in enumerate(zip(all_sents, all_embeddings)):
-                similarity_score = 0.0
-
-                if sentence_embeddings: # If there are past sentences to compare against
-                    # FAISS requires a 2D array for the index
-                    past_embeddings_np = np.array(sentence_embeddings)
-                    index = faiss.IndexFlatL2(sent_embedding.shape[0])
-                    index.add(past_embeddings_np)
-                    
-                    # FAISS search requires a 2D array for the query
-                    query_embedding_np = np.array([sent_embedding])
-                    D, I = index.search(query_embedding_np, 1) # Search for 1 nearest neighbor
-                    
-                    # Approximate cosine similarity from L2 distance
-                    # This is a heuristic that works well for normalized embeddings like those from SBERT
-                    l2_distance = D[0][0]
-                    similarity_score = 1 - (l2_distance / 2)
-
-                sentence_embeddings.append(sent_embedding)
-                color = get_color(similarity_score)
-                sentence_html_colored += f'<span style="background-color: {color}; padding: 0.2em; margin-right: 0.2em; display: inline-block;">{sent_text}</span>'
-                
-                # Check if this sentence is the last one in its paragraph
-                if i + 1 < len(all_sents):
-                    current_para_sents = [s.text for s in nlp(paragraphs[0]).sents]
-                    if sent_text == current_para_sents[-1]:
-                        sentence_html_colored += '<br><br>\n'
-                        paragraphs.pop(0)
-
-            self.signals.result.emit(sentence_html_colored)
+            scores = self._max_past_similarities(embeddings)
+
+            def iter_spans():
+                sent_i = 0
+                for sents in para_sents:
+                    for sent_text in sents:
+                        color = get_color(float(scores[sent_i]))
+                        yield f'<span style="background-color: {color}; padding: 0.2em; margin-right: 0.2em; display: inline-block;">{sent_text}</span>'
+                        sent_i += 1
+                    # Paragraph boundary (known from para_sents, no re-splitting needed)
+                    if sents and sent_i < len(all_sents):
+                        yield '<br><br>\n'
+
+            self.signals.progress.emit("Writing report...")
+            with open(self.export_filepath, "w", encoding="utf-8", buffering=1 << 20) as f:
+                f.writelines(self.html_writer(self.echo_list_html, iter_spans()))
+            self.signals.result.emit(self.export_filepath)
 
         except Exception as e:
             import traceback
@@ -135,8 +337,12 @@ class MainWindow(QMainWindow):
 
         self.settings = QSettings()
         self.model = ProjectModel()
-        self.last_clean_state = None 
-        self.export_filepath = None # Store filepath during async export
+        self.last_clean_state = None
+        self._plain_text_cache = None # Flat snapshot of the narrative text for fast regex scans
+        self._echo_pattern_cache = {} # phrase text -> compiled regex, shared by highlight and export
+        self._last_highlight = None # Last search text actually highlighted; None forces a re-run
+        self._is_highlighting = False # True while the highlighter applies char formats
+        self._para_cache = {} # paragraph digest -> (sentences, embeddings) for semantic re-exports
 
         self._setup_ui()
         self._connect_signals()
@@ -329,6 +535,7 @@ class MainWindow(QMainWindow):
 
     @Slot(dict)
     def on_project_loaded(self, data):
+        self._echo_pattern_cache.clear()
         self.narrative_text_edit.setText(data.get("original_text", ""))
         self.min_words_spinbox.blockSignals(True)
         self.max_words_spinbox.blockSignals(True)
@@ -357,6 +564,7 @@ class MainWindow(QMainWindow):
 
     @Slot(list)
     def update_results_table(self, results):
+        self._echo_pattern_cache.clear()
         self.results_table.setRowCount(0)
         self.results_table.setRowCount(len(results))
         for row, item in enumerate(results):
@@ -365,6 +573,8 @@ class MainWindow(QMainWindow):
 
             count_item = QTableWidgetItem(str(item['count']))
             count_item.setData(Qt.ItemDataRole.UserRole, item['count'])
+            # Cache the display string so the highlight reset loop needn't re-format it
+            count_item.setData(Qt.ItemDataRole.UserRole + 1, str(item['count']))
             
             self.results_table.setItem(row, 0, count_item)
             self.results_table.setItem(row, 1, QTableWidgetItem(str(item['words'])))
@@ -426,6 +636,10 @@ class MainWindow(QMainWindow):
         self.model.process_text()
 
     def on_narrative_text_changed(self):
+        if self._is_highlighting:
+            return # textChanged fired by the highlighter's own format edits; the text is unchanged
+        self._plain_text_cache = None # Invalidate snapshot; rebuilt lazily on next highlight
+        self._last_highlight = None # Text changed, so the same search term must re-highlight
         self._check_dirty_state()
         self.update_process_button_state()
         if not self.highlight_field.text(): return
@@ -462,45 +676,73 @@ class MainWindow(QMainWindow):
                 QApplication.clipboard().setText(phrase_text)
                 self.status_bar.showMessage(f"Copied to clipboard: '{phrase_text}'", 4000)
 
+    def _get_phrase_pattern(self, phrase: str):
+        """Returns the compiled word-boundary regex for a phrase, caching compilations."""
+        pattern = self._echo_pattern_cache.get(phrase)
+        if pattern is None:
+            words = re.split(r'\s+', phrase)
+            pattern = re.compile(r'\b' + r'\W*'.join(re.escape(word) for word in words) + r'\b', re.IGNORECASE)
+            self._echo_pattern_cache[phrase] = pattern
+        return pattern
+
     def _clear_highlights(self):
-        cursor = QTextCursor(self.narrative_text_edit.document())
-        cursor.select(QTextCursor.SelectionType.Document)
-        cursor.setCharFormat(QTextCharFormat())
+        # setCharFormat re-emits textChanged; flag the pass so the handler
+        # does not wipe the highlight caches over a format-only edit.
+        was_highlighting = self._is_highlighting
+        self._is_highlighting = True
+        try:
+            cursor = QTextCursor(self.narrative_text_edit.document())
+            cursor.select(QTextCursor.SelectionType.Document)
+            cursor.setCharFormat(QTextCharFormat())
+        finally:
+            self._is_highlighting = was_highlighting
 
     @Slot()
     def _perform_live_highlight(self):
-        self._clear_highlights()
         search_text = self.highlight_field.text().strip()
+        if search_text == self._last_highlight:
+            return # Document and search term unchanged; highlights are already current
+        self._last_highlight = search_text
+
+        self._clear_highlights()
 
         for row in range(self.results_table.rowCount()):
             count_item = self.results_table.item(row, 0)
             if count_item is not None:
-                original_count = count_item.data(Qt.ItemDataRole.UserRole)
-                count_item.setText(str(original_count))
+                count_item.setText(count_item.data(Qt.ItemDataRole.UserRole + 1))
                 count_item.setForeground(QApplication.palette().text().color())
         
         if not search_text: return
-        
-        words = re.split(r'\s+', search_text)
-        pattern = r'\b' + r'\W*'.join(re.escape(word) for word in words) + r'\b' 
-        q_regex = QRegularExpression(pattern, QRegularExpression.PatternOption.CaseInsensitiveOption)
-        
+
+        pattern = self._get_phrase_pattern(search_text)
+
         palette = self.palette()
         highlight_color = palette.color(QPalette.ColorRole.Highlight)
         highlighted_text_color = palette.color(QPalette.ColorRole.HighlightedText)
         highlight_format = QTextCharFormat()
         highlight_format.setBackground(highlight_color)
         highlight_format.setForeground(highlighted_text_color)
-        
+
+        # Scan a flat string snapshot instead of walking the QTextDocument tree per match,
+        # then apply formats by position inside a single edit block.
+        if self._plain_text_cache is None:
+            self._plain_text_cache = self.narrative_text_edit.toPlainText()
+        spans = [m.span() for m in pattern.finditer(self._plain_text_cache)]
+        found_count = len(spans)
+
         doc = self.narrative_text_edit.document()
         cursor = QTextCursor(doc)
-        found_count = 0
-        while True:
-            cursor = doc.find(q_regex, cursor)
-            if cursor.isNull(): break
-            found_count += 1
-            cursor.mergeCharFormat(highlight_format)
-            
+        self._is_highlighting = True # mergeCharFormat re-emits textChanged
+        try:
+            cursor.beginEditBlock()
+            for start, end in spans:
+                cursor.setPosition(start)
+                cursor.setPosition(end, QTextCursor.MoveMode.KeepAnchor)
+                cursor.mergeCharFormat(highlight_format)
+            cursor.endEditBlock()
+        finally:
+            self._is_highlighting = False
+
         for row in range(self.results_table.rowCount()):
             phrase_item = self.results_table.item(row, 2)
             if phrase_item and phrase_item.text() == search_text:
@@ -546,18 +788,15 @@ class MainWindow(QMainWindow):
         self.action_export_semantic_echo.setEnabled(enable and SEMANTIC_ENABLED) 
 
     def _convert_newlines_to_html(self, text_segment: str) -> str:
-        text_segment = text_segment.replace('\r\n', '\n')
-        text_segment = re.sub(r'\n{3,}', '<br><br><br>', text_segment)
-        text_segment = re.sub(r'\n{2}', '<br><br>', text_segment)
-        text_segment = re.sub(r'\n', '<br>', text_segment)
-        return text_segment
+        # Single traversal: one <br> per newline in each run, capped at three.
+        return _NL_RE.sub(lambda m: '<br>' * min(m.group().count('\n'), 3), text_segment)
 
     def _generate_echo_list_html_content(self) -> str:
         original_text = self.model.data.get("original_text", "")
         echo_results = self.model.data.get("echo_results", [])
         
-        saturation = 75
-        lightness = 15
+        saturation = _EXPORT_SATURATION
+        lightness = _EXPORT_LIGHTNESS
 
         def get_hsl_color(hue, sat=saturation, lit=lightness): return f"hsl({hue}, {sat}%, {lit}%)"
         
@@ -581,17 +820,37 @@ class MainWindow(QMainWindow):
             hue = 300 - (final_severity * 300)
             return get_hsl_color(hue)
 
-        all_spans = []
+        span_meta = []  # (start, end, occurrence_index, total_occurrences, phrase_word_count)
         for echo_item in echo_results:
-            words = re.split(r'\s+', echo_item['phrase'])
-            pattern = r'\b' + r'\W*'.join(re.escape(word) for word in words) + r'\b'
-            
-            matches = sorted([(m.start(), m.end()) for m in re.finditer(pattern, original_text, re.IGNORECASE)], key=lambda x: x[0])
-            
+            pattern = self._get_phrase_pattern(echo_item['phrase'])
+
+            matches = sorted([(m.start(), m.end()) for m in pattern.finditer(original_text)], key=lambda x: x[0])
+
             for i, (start, end) in enumerate(matches):
-                color = get_echo_occurrence_hsl_color(i, len(matches), echo_item['words'])
-                all_spans.append((start, end, color))
-        
+                span_meta.append((start, end, i, len(matches), echo_item['words']))
+
+        if _span_hues is not None and span_meta:
+            # JIT-compiled kernel over all spans at once.
+            occ_idx = _hue_np.array([m[2] for m in span_meta], dtype=_hue_np.float64)
+            tot = _hue_np.array([m[3] for m in span_meta], dtype=_hue_np.float64)
+            wc = _hue_np.array([m[4] for m in span_meta], dtype=_hue_np.float64)
+            hues = _span_hues(occ_idx, tot, wc)
+            all_spans = [(m[0], m[1], get_hsl_color(hue)) for m, hue in zip(span_meta, hues)]
+        elif _hue_np is not None and span_meta:
+            # Batch the piecewise severity formula over all spans in one NumPy pass
+            # instead of calling get_echo_occurrence_hsl_color per (echo, occurrence).
+            occ_idx = _hue_np.array([m[2] for m in span_meta], dtype=_hue_np.float64)
+            tot = _hue_np.array([m[3] for m in span_meta], dtype=_hue_np.float64)
+            wc = _hue_np.array([m[4] for m in span_meta], dtype=_hue_np.float64)
+            progress = _hue_np.where(tot > 1, occ_idx / _hue_np.maximum(tot - 1, 1), 0.0)
+            max_sev = _hue_np.where(wc <= 2, 0.2, _hue_np.where(wc >= 4, 1.0, 0.2 + 0.8 * (wc - 2) / 2))
+            severity = _hue_np.where(wc >= 16, 1.0, progress * max_sev).clip(0.0, 1.0)
+            hues = _hue_np.where(tot < 2, 300.0, 300.0 - severity * 300.0)
+            all_spans = [(m[0], m[1], get_hsl_color(hue)) for m, hue in zip(span_meta, hues)]
+        else:
+            all_spans = [(start, end, get_echo_occurrence_hsl_color(i, total, wc))
+                         for start, end, i, total, wc in span_meta]
+
         all_spans.sort(key=lambda x: x[0])
         
         html_parts, current_idx = [], 0
@@ -611,12 +870,11 @@ class MainWindow(QMainWindow):
         if not filepath: return
         
         echo_list_html = self._generate_echo_list_html_content()
-        saturation, lightness = 75, 15
-        
-        html_content = self._get_combined_html_template(saturation, lightness, echo_list_html, '<p style="text-align: center; color: gray;">This view requires a semantic analysis export.</p>')
-        
+
         try:
-            with open(filepath, "w", encoding="utf-8") as f: f.write(html_content)
+            # Stream chunks through a large buffer instead of assembling one string
+            with open(filepath, "w", encoding="utf-8", buffering=1 << 20) as f:
+                f.writelines(self._iter_combined_html(echo_list_html, '<p style="text-align: center; color: gray;">This view requires a semantic analysis export.</p>'))
             self.status_bar.showMessage(f"Echo List exported to {filepath}", 4000)
         except Exception as e:
             QMessageBox.critical(self, "Export Error", f"Failed to save HTML file: {e}")
@@ -631,107 +889,38 @@ class MainWindow(QMainWindow):
         
         filepath, _ = QFileDialog.getSaveFileName(self, "Export Semantic Echo (HTML)", "", "HTML Files (*.html)")
         if not filepath: return
-        self.export_filepath = filepath
-        
-        worker = SemanticExportWorker(self.model.data.get("original_text", ""))
+
+        worker = SemanticExportWorker(self.model.data.get("original_text", ""), filepath,
+                                      self._generate_echo_list_html_content(),
+                                      self._iter_combined_html, self._para_cache)
         worker.signals.progress.connect(lambda msg: self.status_bar.showMessage(msg, 0))
+        worker.signals.progress_count.connect(self._on_semantic_progress, Qt.ConnectionType.QueuedConnection)
         worker.signals.error.connect(lambda err: QMessageBox.critical(self, "Semantic Error", err))
         worker.signals.finished.connect(lambda: self.status_bar.showMessage("Semantic analysis complete.", 4000))
         worker.signals.result.connect(self._on_semantic_export_result)
         
         self.model.threadpool.start(worker)
 
-    @Slot(str)
-    def _on_semantic_export_result(self, semantic_html_content):
-        echo_list_html = self._generate_echo_list_html_content()
-        saturation, lightness = 75, 15
-        
-        html_content = self._get_combined_html_template(saturation, lightness, echo_list_html, semantic_html_content)
-        
-        try:
-            with open(self.export_filepath, "w", encoding="utf-8") as f: f.write(html_content)
-            self.status_bar.showMessage(f"Semantic Echo report exported to {self.export_filepath}", 4000)
-        except Exception as e:
-            QMessageBox.critical(self, "Export Error", f"Failed to save HTML file: {e}")
-        finally:
-            self.export_filepath = None
-
-    def _get_combined_html_template(self, saturation, lightness, echo_list_html, semantic_echo_html):
-        return f"""<!DOCTYPE html>
-<html>
-<head>
-<title>Repetition Heatmap</title>
-<style>
-body {{ font-family: sans-serif; background-color: #333; color: white; }}
-#toggles {{ position: fixed; top: 10px; left: 25%; transform: translateX(-50%); text-align: center; z-index: 10; }}
-#toggles button {{ margin-right: 10px; padding: 5px 10px; cursor: pointer; }}
-.no-colors #semantic-echo-view span, .no-colors #echo-list-view span.echo-highlight {{ background-color: transparent !important; }}
-.echo-highlight {{ padding: 0.1em 0.2em; border-radius: 0.2em; }}
-</style>
-</head>
-<body class="show-colors">
-
-<div id="color-legend" style="margin-bottom: 20px;">
-    <h3>Color Legend: Repetition Level</h3>
-    <div style="display: flex; align-items: center; flex-wrap: wrap;">
-        <span style="background-color: hsl(300, {saturation}%, {lightness}%); width: 30px; height: 30px; display: inline-block; margin-right: 5px; border: 1px solid #555;"></span> Purple: Very Low Repetition   
-        <span style="background-color: hsl(240, {saturation}%, {lightness}%); width: 30px; height: 30px; display: inline-block; margin-right: 5px; border: 1px solid #555;"></span> Blue: Low Repetition   
-        <span style="background-color: hsl(120, {saturation}%, {lightness}%); width: 30px; height: 30px; display: inline-block; margin-right: 5px; border: 1px solid #555;"></span> Green: Moderate Repetition   
-        <span style="background-color: hsl(60 , {saturation}%, {lightness}%); width: 30px; height: 30px; display: inline-block; margin-right: 5px; border: 1px solid #555;"></span> Yellow: High Repetition   
-        <span style="background-color: hsl(0  , {saturation}%, {lightness}%); width: 30px; height: 30px; display: inline-block; margin-right: 5px; border: 1px solid #555;"></span> Red: Very High Repetition (Review)
-    </div>
-</div>
-
-<div id="toggles">
-    <button id="toggle-view">Semantic Echo View</button>
-    <button id="toggle-colors">Hide Colors</button>
-</div>
-
-<h2 id="semantic-echo-header" style="display: none;">Echo List and Semantic Echo Level Repetition</h2>
-<div id="semantic-echo-view" style="display: none;">
-    {semantic_echo_html}
-</div>
-
-<h2 id="echo-list-header">Echo List Level Repetition</h2>
-<div id="echo-list-view" style="display: block;">
-    {echo_list_html}
-</div>
-
-<script>
-    const toggleViewButton = document.getElementById('toggle-view');
-    const toggleColorsButton = document.getElementById('toggle-colors');
-    const semanticEchoView = document.getElementById('semantic-echo-view');
-    const echoListView = document.getElementById('echo-list-view');
-    const semanticEchoHeader = document.getElementById('semantic-echo-header');
-    const echoListHeader = document.getElementById('echo-list-header');
-    let isEchoListView = true;
-    let areColorsVisible = true;
+    @Slot(int, int)
+    def _on_semantic_progress(self, processed, total):
+        self.status_bar.showMessage(f"Calculating similarities... {processed}/{total} sentences", 0)
 
-    toggleViewButton.addEventListener('click', function() {{
-        isEchoListView = !isEchoListView;
-        if (isEchoListView) {{
-            semanticEchoView.style.display = 'none'; semanticEchoHeader.style.display = 'none';
-            echoListView.style.display = 'block'; echoListHeader.style.display = 'block';
-            toggleViewButton.textContent = 'Semantic Echo View';
-        }} else {{
-            semanticEchoView.style.display = 'block'; semanticEchoHeader.style.display = 'block';
-            echoListView.style.display = 'none'; echoListHeader.style.display = 'none';
-            toggleViewButton.textContent = 'Echo List View';
-        }}
-    }});
-    toggleColorsButton.addEventListener('click', function() {{
-        areColorsVisible = !areColorsVisible;
-        if (areColorsVisible) {{
-            document.body.classList.remove('no-colors');
-            toggleColorsButton.textContent = 'Hide Colors';
-        }} else {{
-            document.body.classList.add('no-colors');
-            toggleColorsButton.textContent = 'Show Colors';
-        }}
-    }});
-</script>
-</body>
-</html>"""
+    @Slot(str)
+    def _on_semantic_export_result(self, filepath):
+        # The worker has already streamed the report to disk.
+        self.status_bar.showMessage(f"Semantic Echo report exported to {filepath}", 4000)
+
+    def _iter_combined_html(self, echo_list_html, semantic_echo_html):
+        """Yields the combined report in chunks; writelines() streams them to the
+        file so export never assembles the multi-MB document in one string."""
+        yield _HTML_HEAD
+        if isinstance(semantic_echo_html, str):
+            yield semantic_echo_html
+        else:
+            yield from semantic_echo_html # already an iterator of chunks
+        yield _HTML_MID
+        yield echo_list_html
+        yield _HTML_TAIL
 
 def apply_app_settings(settings):
     available_styles = QStyleFactory.keys()
@@ -1,7 +1,90 @@
 # model.py
+import bisect
+import functools
+import hashlib
+import json
+import os
 import re
+import sys
+import time
+from array import array
+from concurrent.futures import ThreadPoolExecutor
+from collections import OrderedDict, defaultdict
+from pathlib import Path
 from PySide6.QtCore import QObject, QRunnable, QThreadPool, Signal, Slot
 
+# One-pass tokenizer: matches each whitespace-delimited token, with group(1)
+# capturing the token minus leading/trailing punctuation so stripping needs no
+# per-token re.sub pass. The lookaround assertions rule out RE2-family
+# engines, so this compiles through stdlib re.
+_CORE_RE = re.compile(r'(?:^|(?<=\s))(?=\S)[^\w\s]*(\S*?)[^\w\s]*(?=\s|$)', re.UNICODE)
+
+# Optional JIT acceleration for the n-gram sweep; everything works without it.
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Optional C-coded JSON codec for project files; stdlib json is the fallback.
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+_ngram_hashes = None
+if np is not None:
+    try:
+        from numba import njit
+    except ImportError:
+        pass
+    else:
+        @njit(cache=True, nogil=True)
+        def _ngram_hashes(ids, n):
+            """Returns a rolling polynomial hash (mod 2^64) of every length-n
+            window of ids: O(N) per length instead of O(N*n), since each window
+            drops its leading term and appends the next id. Collisions are
+            harmless - callers verify matches with exact id tuples."""
+            P = np.uint64(1099511628211)
+            count = ids.shape[0] - n + 1
+            out = np.empty(count, dtype=np.uint64)
+            pn = np.uint64(1) # P^(n-1), the weight of a window's leading id
+            for _ in range(n - 1):
+                pn = pn * P
+            h = np.uint64(0)
+            for j in range(n):
+                h = h * P + np.uint64(ids[j])
+            out[0] = h
+            for i in range(1, count):
+                h = (h - np.uint64(ids[i - 1]) * pn) * P + np.uint64(ids[i + n - 1])
+                out[i] = h
+            return out
+
+def _overlaps_accepted(intervals, start, end):
+    """True if [start, end) intersects any interval in the sorted,
+    non-overlapping accepted list."""
+    i = bisect.bisect_left(intervals, (end,))
+    return i > 0 and intervals[i - 1][1] > start
+
+def _insort_interval(intervals, start, end):
+    """Inserts [start, end) keeping the list sorted, merging any spans it
+    touches (occurrences of a single accepted phrase may overlap each other)."""
+    i = bisect.bisect_left(intervals, (start, end))
+    while i > 0 and intervals[i - 1][1] >= start:
+        start = intervals[i - 1][0]
+        end = max(end, intervals[i - 1][1])
+        del intervals[i - 1]
+        i -= 1
+    while i < len(intervals) and intervals[i][0] <= end:
+        end = max(end, intervals[i][1])
+        del intervals[i]
+    intervals.insert(i, (start, end))
+
+@functools.lru_cache(maxsize=8)
+def _whitelist_lower_set(whitelist_tuple):
+    """Lowercased whitelist entries; memoized so repeated runs with the same
+    whitelist (the common case when only min/max change) pay nothing."""
+    return frozenset(w.lower() for w in whitelist_tuple)
+
 class WorkerSignals(QObject):
     """Defines the signals available from a running worker thread."""
     finished = Signal()
@@ -12,143 +95,242 @@ class WorkerSignals(QObject):
 
 class EchoFinderWorker(QRunnable):
     """Worker thread for finding echoes in text."""
-    def __init__(self, text, min_words, max_words, whitelist, strip_punctuation, skip_overlapping_echoes):
+    def __init__(self, text, min_words, max_words, whitelist, strip_punctuation, skip_overlapping_echoes, cached_ngrams=None, cached_tokens=None):
         super().__init__()
         self.text = text
         self.min_words = min_words
         self.max_words = max_words
-        # Create a lowercase set for fast, case-insensitive lookups
-        self.whitelist_lower = {w.lower() for w in whitelist}
-        self.whitelist_original = whitelist # Keep original for regex
+        # Lowercase set for fast, case-insensitive lookups (cached across runs)
+        self.whitelist_lower = _whitelist_lower_set(tuple(whitelist))
         self.strip_punctuation = strip_punctuation
         self.skip_overlapping_echoes = skip_overlapping_echoes
+        # Per-length occurrence maps from a previous run over the same
+        # (text, whitelist, strip) triple; lengths found here are reused as-is.
+        self.cached_ngrams = cached_ngrams
+        # Token arrays from a previous run over the same triple; tokenization
+        # is independent of min/max, so parameter sweeps skip step 1 entirely.
+        self.cached_tokens = cached_tokens
+        self.tokens = None # (starts, ends, words, word count) produced by this run
+        self.by_n = {} # n -> occurrence map produced by this run (for the model's cache)
         self.signals = WorkerSignals()
+        self._last_progress_ts = 0.0
+
+    def _emit_progress(self, msg, throttle=False):
+        """Emits a progress message. Phase-boundary messages always go out;
+        high-frequency callers pass throttle=True to cap cross-thread
+        emissions at 10 per second."""
+        now = time.monotonic()
+        if throttle and now - self._last_progress_ts <= 0.1:
+            return
+        self.signals.progress.emit(msg)
+        self._last_progress_ts = now
 
     @Slot()
     def run(self):
         try:
             # 1. Tokenization
-            self.signals.progress.emit("Step 1/5: Tokenizing text...")
-            
-            token_pattern = r'\S+' # Matches any sequence of non-whitespace characters
-            tokens = []
-            
-            for match in re.finditer(token_pattern, self.text):
-                original_word_segment = match.group(0)
-                start, end = match.span()
-                
-                # --- Normalization Logic for internal 'phrase' key ---
-                normalized_word = original_word_segment.lower()
-                
-                # Case-insensitive whitelist check
-                is_whitelisted = False
-                for w_item in self.whitelist_original:
-                    if original_word_segment.lower() == w_item.lower():
-                        is_whitelisted = True
-                        break
-
-                if not is_whitelisted:
-                    # Non-whitelisted words:
-                    if self.strip_punctuation:
-                        # Aggressively strip leading/trailing punctuation
-                        normalized_word = re.sub(r'^[^\w\s]+|[^\w\s]+$', '', normalized_word, flags=re.UNICODE)
-                    # Else (strip_punctuation is False), normalized_word remains as is (e.g., "hello,")
-                
-                # Only care about tokens that result in a non-empty normalized word for phrase generation
-                if normalized_word:
-                    tokens.append({'normalized': normalized_word, 'original': original_word_segment, 'start': start, 'end': end})
-
-            if tokens:
-                # Count actual words (alphanumeric sequences) in the original text for max_words_available
-                text_word_count = len(re.findall(r'\b[a-zA-Z0-9\'’`]+\b', self.text, flags=re.UNICODE))
-                self.signals.max_words_available.emit(text_word_count)
+            self._emit_progress("Step 1/5: Tokenizing text...")
+
+            if self.cached_tokens is not None:
+                starts, ends, words, text_word_count = self.cached_tokens
             else:
-                self.signals.max_words_available.emit(0) # No words found
+                # Struct-of-arrays token layout: parallel char-offset arrays plus the
+                # normalized word list, instead of one dict per token.
+                starts = array('i')
+                ends = array('i')
+                words = []
+
+                for match in _CORE_RE.finditer(self.text):
+                    # --- Normalization Logic for internal 'phrase' key ---
+                    normalized_word = match.group(0).lower()
+
+                    # Case-insensitive whitelist check
+                    if normalized_word not in self.whitelist_lower:
+                        # Non-whitelisted words:
+                        if self.strip_punctuation:
+                            # The capture group is the token with leading/trailing
+                            # punctuation already stripped by the tokenizer pass
+                            normalized_word = match.group(1).lower()
+                        # Else (strip_punctuation is False), normalized_word remains as is (e.g., "hello,")
+
+                    # Only care about tokens that result in a non-empty normalized word for phrase generation
+                    if normalized_word:
+                        # Intern so the thousands of repeats of a word share one str
+                        # object and the token-id lookup is a pointer comparison.
+                        words.append(sys.intern(normalized_word))
+                        starts.append(match.start())
+                        ends.append(match.end())
+
+                # The longest possible phrase is bounded by the tokens actually
+                # available for phrase generation, so the cap comes straight
+                # from the token list instead of a second full-text regex scan.
+                text_word_count = len(words)
+
+            self.tokens = (starts, ends, words, text_word_count)
+            self.signals.max_words_available.emit(text_word_count)
 
             # 2. N-gram Generation
-            self.signals.progress.emit("Step 2/5: Generating phrases...")
-            phrase_occurrences = {}
+            self._emit_progress("Step 2/5: Generating phrases...")
+
+            # Map each normalized word to a small integer id. Phrase keys become
+            # tuples of ids, so the hot loop below hashes small-int tuples instead
+            # of allocating and hashing a joined string per n-gram.
+            token_id = {}
+            ids = []
+            for word in words:
+                wid = token_id.get(word)
+                if wid is None:
+                    wid = len(token_id)
+                    token_id[word] = wid
+                ids.append(wid)
+            id_word = [None] * len(token_id)
+            for word, wid in token_id.items():
+                id_word[wid] = word
+
+            cached_ngrams = self.cached_ngrams if self.cached_ngrams is not None else {}
+            id_arr = np.asarray(ids, dtype=np.int32) if _ngram_hashes is not None else None
+            hashes_by_n = {}
+            if _ngram_hashes is not None:
+                # The nogil kernel runs truly in parallel, so hash every
+                # uncached length up front across threads; the dict grouping
+                # below stays serial because it is GIL-bound anyway.
+                lengths = [n for n in range(self.min_words, self.max_words + 1)
+                           if 0 < n <= len(words) and n not in cached_ngrams]
+                if len(lengths) > 1:
+                    with ThreadPoolExecutor(max_workers=min(len(lengths), os.cpu_count() or 1)) as pool:
+                        hashes_by_n = dict(zip(lengths, pool.map(
+                            lambda n: _ngram_hashes(id_arr, n), lengths)))
             for n in range(self.min_words, self.max_words + 1):
                 if n == 0: continue # Skip 0-word phrases
-                if n > len(tokens): break
-                for i in range(len(tokens) - n + 1):
-                    phrase_tokens = tokens[i : i + n]
-                    
-                    # The phrase key is ALWAYS built from normalized words
-                    phrase_key = " ".join(t['normalized'] for t in phrase_tokens)
-                    
-                    # Store original occurrence span for later
-                    occurrence = {'start': phrase_tokens[0]['start'], 'end': phrase_tokens[-1]['end']}
-                    
-                    if phrase_key not in phrase_occurrences:
-                        phrase_occurrences[phrase_key] = []
-                    phrase_occurrences[phrase_key].append(occurrence)
+                if n > len(words): break
+                if n in cached_ngrams:
+                    # This length was already swept in a previous run over the
+                    # same text/whitelist/strip combination.
+                    phrase_occurrences = self.by_n[n] = cached_ngrams[n]
+                elif _ngram_hashes is not None:
+                    # JIT path: hash every window natively, group positions by
+                    # hash, and only build id tuples for windows whose hash
+                    # repeats - unique n-grams (the vast majority) never
+                    # allocate a key at all. Tuple keys verify exactness, so
+                    # hash collisions cannot merge distinct phrases.
+                    # defaultdict keeps the missing-key path in C: one lookup per
+                    # n-gram instead of a membership test plus two item accesses.
+                    phrase_occurrences = self.by_n[n] = defaultdict(lambda: array('i'))
+                    window_hashes = hashes_by_n.get(n)
+                    if window_hashes is None:
+                        window_hashes = _ngram_hashes(id_arr, n)
+                    pos_by_hash = defaultdict(list)
+                    for i, h in enumerate(window_hashes.tolist()):
+                        pos_by_hash[h].append(i)
+                    for positions in pos_by_hash.values():
+                        if len(positions) < 2:
+                            continue
+                        for i in positions:
+                            # Flat start,end pairs in one int array instead of a
+                            # list of per-occurrence objects.
+                            occ = phrase_occurrences[tuple(ids[i : i + n])]
+                            occ.append(starts[i])
+                            occ.append(ends[i + n - 1])
+                else:
+                    phrase_occurrences = self.by_n[n] = defaultdict(lambda: array('i'))
+                    for i in range(len(words) - n + 1):
+                        # Store the original occurrence span as a flat start,end pair
+                        occ = phrase_occurrences[tuple(ids[i : i + n])]
+                        occ.append(starts[i])
+                        occ.append(ends[i + n - 1])
+
+                # A repeated (n+1)-gram implies its contained n-grams repeat, so
+                # once a length yields no repeats, no longer length can either.
+                if not any(len(occ) >= 4 for occ in phrase_occurrences.values()):
+                    break
 
             # 3. Frequency Filtering
-            self.signals.progress.emit("Step 3/5: Filtering frequent phrases...")
+            self._emit_progress("Step 3/5: Filtering frequent phrases...")
+            # Keys are id tuples whose length equals n, so the per-length maps
+            # can be merged without collisions.
             repeated_phrases = {
                 phrase: occurrences
-                for phrase, occurrences in phrase_occurrences.items()
-                if len(occurrences) >= 2
+                for occurrence_map in self.by_n.values()
+                for phrase, occurrences in occurrence_map.items()
+                if len(occurrences) >= 4 # at least two start,end pairs
             }
 
             # Prepare richer candidates with first_occurrence_start for sorting
             candidate_echoes = []
             for phrase_key, occurrences in repeated_phrases.items():
-                first_occurrence = occurrences[0]
-                representative_original = self.text[first_occurrence['start']:first_occurrence['end']]
+                # No representative_original slice: consumers that need the raw
+                # span can slice the text from the first occurrence on demand.
                 candidate_echoes.append({
-                    'phrase': phrase_key,
-                    'representative_original': representative_original,
-                    'count': len(occurrences),
-                    'words': len(phrase_key.split()),
+                    'phrase': " ".join(id_word[wid] for wid in phrase_key),
+                    'key': phrase_key,
+                    'count': len(occurrences) // 2,
+                    'words': len(phrase_key),
                     'occurrences': occurrences,
-                    'first_occurrence_start': first_occurrence['start']
+                    'first_occurrence_start': occurrences[0]
                 })
 
             final_results = []
             if self.skip_overlapping_echoes:
-                self.signals.progress.emit("Step 4/5: Applying skip overlap filtering...")
+                self._emit_progress("Step 4/5: Applying skip overlap filtering...")
                 # Sort by words (desc), count (desc), first_occurrence_start (asc)
                 candidate_echoes.sort(key=lambda x: (-x['words'], -x['count'], x['first_occurrence_start']))
                 
-                covered_indices = [False] * (len(self.text) + 1) # +1 for exclusive end index
-                
+                # Accepted spans kept as sorted, non-overlapping intervals:
+                # bisect answers each overlap query in O(log k) accepted echoes
+                # instead of scanning a text-length coverage bitmap.
+                accepted_intervals = []
+
                 for echo_candidate in candidate_echoes:
+                    occ = echo_candidate['occurrences']
                     overlaps_existing_selection = False
                     # Check all occurrences of the candidate
-                    for occ in echo_candidate['occurrences']:
-                        # Check if any part of this occurrence is already covered
-                        if any(covered_indices[i] for i in range(occ['start'], occ['end'])):
+                    for j in range(0, len(occ), 2):
+                        if _overlaps_accepted(accepted_intervals, occ[j], occ[j + 1]):
                             overlaps_existing_selection = True
                             break # This occurrence overlaps, no need to check others for this candidate
-                    
+
                     if not overlaps_existing_selection:
                         final_results.append(echo_candidate)
-                        # Mark all occurrences of this selected candidate as covered
-                        for occ in echo_candidate['occurrences']:
-                            for i in range(occ['start'], occ['end']):
-                                covered_indices[i] = True
+                        # Record all occurrences of this selected candidate
+                        for j in range(0, len(occ), 2):
+                            _insort_interval(accepted_intervals, occ[j], occ[j + 1])
+            elif self.min_words == self.max_words:
+                self._emit_progress("Step 4/5: Applying maximal match filtering...")
+                # All phrases share one length, so none can contain another;
+                # the sub-phrase removal pass has nothing to do.
+                final_results = candidate_echoes
             else:
-                self.signals.progress.emit("Step 4/5: Applying maximal match filtering...")
-                # Existing Maximal Match Filtering (substring removal)
+                self._emit_progress("Step 4/5: Applying maximal match filtering...")
+                # Maximal Match Filtering (sub-phrase removal)
                 # Sort by words (desc) to ensure longer phrases are processed first
                 candidate_echoes.sort(key=lambda p: p['words'], reverse=True)
-                
-                maximal_echoes_processed = set() # Store normalized phrases already marked as maximal
-                
+
+                # Every word-aligned sub-gram of each kept phrase is indexed by
+                # length, so containment is a single set lookup per candidate
+                # instead of a substring scan over all kept phrases.
+                kept_subgrams = {} # phrase length -> set of contained id tuples
+
                 for candidate in candidate_echoes:
-                    is_substring_of_existing_maximal = False
-                    for existing_max_phrase in maximal_echoes_processed:
-                        if candidate['phrase'] in existing_max_phrase:
-                            is_substring_of_existing_maximal = True
-                            break
-                    
-                    if not is_substring_of_existing_maximal:
-                        final_results.append(candidate)
-                        maximal_echoes_processed.add(candidate['phrase'])
-
-            self.signals.progress.emit("Step 5/5: Finalizing results...")
+                    key = candidate['key']
+                    n = len(key)
+                    if key in kept_subgrams.get(n, ()):
+                        continue # Sub-phrase of an already-kept maximal echo
+
+                    final_results.append(candidate)
+                    for k in range(self.min_words, n):
+                        bucket = kept_subgrams.get(k)
+                        if bucket is None:
+                            bucket = kept_subgrams[k] = set()
+                        for i in range(n - k + 1):
+                            bucket.add(key[i : i + k])
+
+            self._emit_progress("Step 5/5: Finalizing results...")
+            for result in final_results:
+                del result['key']
+                # Expose occurrences as (start, end) pairs; the flat arrays stay
+                # internal to the sweep (and to the model's n-gram cache).
+                occ = result['occurrences']
+                result['occurrences'] = list(zip(occ[0::2], occ[1::2]))
             self.signals.result.emit(final_results)
 
         except Exception as e:
@@ -166,11 +348,27 @@ class ProjectModel(QObject):
     whitelist_updated = Signal(list)
     max_words_available = Signal(int)
 
+    _RESULT_CACHE_MAX = 8 # LRU cap for memoized processing runs
+
     def __init__(self):
         super().__init__()
         self.data = {}
+        self._whitelist_lower = set() # lowercased entries for O(1) duplicate checks
         self.current_project_path = None
         self.threadpool = QThreadPool()
+        # At most two workers (echo + semantic export) ever run concurrently;
+        # don't keep one thread per logical core alive, and reclaim idle ones.
+        self.threadpool.setMaxThreadCount(2)
+        self.threadpool.setExpiryTimeout(30_000)
+        # (text digest, params) -> (echo results, word count); lets parameter
+        # sweeps over the same text skip the worker entirely.
+        self._result_cache = OrderedDict()
+        # ((text digest, whitelist, strip), {n: occurrence map}) from the last
+        # worker run; widening the word range only computes the new lengths.
+        self._ngram_cache = None
+        # ((text digest, whitelist, strip), token arrays) from the last worker
+        # run; min/max sweeps over the same text skip tokenization.
+        self._token_cache = None
         self.status_message.emit("Ready. Create a new project or open an existing one.", 0)
 
     def new_project(self, preferred_preset="by_word_count"):
@@ -186,14 +384,15 @@ class ProjectModel(QObject):
             "last_used_sort_preset": preferred_preset,
             "echo_results": []
         }
+        self._whitelist_lower = {w.lower() for w in self.data["custom_whitelist"]}
         self.project_loaded.emit(self.data)
         self.status_message.emit("New project created. Paste text to begin.", 4000)
     
     def load_project(self, filepath):
         try:
-            with open(filepath, 'r', encoding='utf-8') as f:
-                import json
-                self.data = json.load(f)
+            with open(filepath, 'rb') as f:
+                raw = f.read()
+                self.data = orjson.loads(raw) if orjson is not None else json.loads(raw)
                 self.current_project_path = filepath
                 
                 # Provide default values for new keys if loading old project files
@@ -201,6 +400,7 @@ class ProjectModel(QObject):
                 self.data.setdefault("skip_overlapping_echoes", True) 
                 self.data.setdefault("last_used_sort_preset", "by_word_count")
                 self.data.setdefault("custom_whitelist", ["Dr.", "Mr.", "Mrs.", "St.", "e.g.", "i.e."])
+                self._whitelist_lower = {w.lower() for w in self.data["custom_whitelist"]}
 
                 self.project_loaded.emit(self.data)
                 self.status_message.emit(f"Project '{self.data.get('project_name', 'Unnamed')}' loaded.", 4000)
@@ -210,34 +410,86 @@ class ProjectModel(QObject):
     def save_project(self, filepath):
         try:
             self.data['project_name'] = self._extract_project_name(filepath)
-            with open(filepath, 'w', encoding='utf-8') as f:
-                import json
-                json.dump(self.data, f, indent=2)
+            if orjson is not None:
+                encoded = orjson.dumps(self.data, option=orjson.OPT_INDENT_2)
+            else:
+                encoded = json.dumps(self.data, indent=2).encode('utf-8')
+            # Encode fully in memory, then write the project file in one call.
+            with open(filepath, 'wb', buffering=1 << 20) as f:
+                f.write(encoded)
                 self.current_project_path = filepath
                 self.status_message.emit(f"Project saved to {filepath}", 4000)
         except Exception as e:
             self.status_message.emit(f"Error saving project: {e}", 5000)
 
     def _extract_project_name(self, filepath):
-        from pathlib import Path
         return Path(filepath).stem
 
     def process_text(self):
+        text = self.data.get("original_text", "")
+        min_words = self.data.get("min_phrase_words", 2)
+        max_words = self.data.get("max_phrase_words", 8)
+        whitelist = self.data.get("custom_whitelist", [])
+        strip_punctuation = self.data.get("strip_punctuation", True)
+        skip_overlapping = self.data.get("skip_overlapping_echoes", True)
+
+        cache_key = (hashlib.blake2b(text.encode('utf-8'), digest_size=16).digest(),
+                     min_words, max_words, tuple(sorted(whitelist)),
+                     strip_punctuation, skip_overlapping)
+        cached = self._result_cache.get(cache_key)
+        if cached is not None:
+            self._result_cache.move_to_end(cache_key)
+            results, word_count = cached
+            self.max_words_available.emit(word_count)
+            self._on_processing_result(list(results))
+            self.status_message.emit("Processing complete (cached).", 4000)
+            return
+
+        ngram_key = (cache_key[0], tuple(sorted(whitelist)), strip_punctuation)
+        cached_ngrams = self._ngram_cache[1] if (self._ngram_cache is not None
+                                                 and self._ngram_cache[0] == ngram_key) else None
+        cached_tokens = self._token_cache[1] if (self._token_cache is not None
+                                                 and self._token_cache[0] == ngram_key) else None
+
         worker = EchoFinderWorker(
-            text=self.data.get("original_text", ""),
-            min_words=self.data.get("min_phrase_words", 2),
-            max_words=self.data.get("max_phrase_words", 8),
-            whitelist=self.data.get("custom_whitelist", []),
-            strip_punctuation=self.data.get("strip_punctuation", True),
-            skip_overlapping_echoes=self.data.get("skip_overlapping_echoes", True)
+            text=text,
+            min_words=min_words,
+            max_words=max_words,
+            whitelist=whitelist,
+            strip_punctuation=strip_punctuation,
+            skip_overlapping_echoes=skip_overlapping,
+            cached_ngrams=cached_ngrams,
+            cached_tokens=cached_tokens
         )
+        captured_word_count = [0]
+        worker.signals.result.connect(lambda results: self._cache_result(cache_key, results, captured_word_count[0]))
         worker.signals.result.connect(self._on_processing_result)
         worker.signals.progress.connect(lambda msg: self.status_message.emit(msg, 0))
+        worker.signals.finished.connect(lambda: self._store_ngram_cache(ngram_key, worker))
         worker.signals.finished.connect(lambda: self.status_message.emit("Processing complete.", 4000))
         worker.signals.error.connect(lambda err: self.status_message.emit(f"Error: {err[1]}", 5000))
+        worker.signals.max_words_available.connect(lambda n: captured_word_count.__setitem__(0, n))
         worker.signals.max_words_available.connect(self.max_words_available)
         self.threadpool.start(worker)
 
+    def _store_ngram_cache(self, ngram_key, worker):
+        tokens = getattr(worker, 'tokens', None)
+        if tokens is not None:
+            self._token_cache = (ngram_key, tokens)
+        by_n = getattr(worker, 'by_n', None)
+        if not by_n:
+            return
+        if self._ngram_cache is not None and self._ngram_cache[0] == ngram_key:
+            merged = dict(self._ngram_cache[1])
+            merged.update(by_n)
+            by_n = merged
+        self._ngram_cache = (ngram_key, by_n)
+
+    def _cache_result(self, cache_key, results, word_count):
+        self._result_cache[cache_key] = (list(results), word_count)
+        while len(self._result_cache) > self._RESULT_CACHE_MAX:
+            self._result_cache.popitem(last=False)
+
     def _on_processing_result(self, results):
         self.data["echo_results"] = results
         self.sort_results() # Apply current sort order to new results
@@ -260,13 +512,15 @@ class ProjectModel(QObject):
         if "custom_whitelist" not in self.data:
             self.data["custom_whitelist"] = []
         # Case-insensitive check before adding
-        if not any(entry.lower() == item.lower() for item in self.data["custom_whitelist"]):
+        if entry.lower() not in self._whitelist_lower:
             self.data["custom_whitelist"].append(entry)
+            self._whitelist_lower.add(entry.lower())
             self.whitelist_updated.emit(self.data["custom_whitelist"])
-    
+
     def remove_whitelist_entry(self, entry):
         # Case-insensitive removal
         entry_lower = entry.lower()
         if "custom_whitelist" in self.data:
             self.data["custom_whitelist"] = [item for item in self.data["custom_whitelist"] if item.lower() != entry_lower]
+            self._whitelist_lower.discard(entry_lower)
             self.whitelist_updated.emit(self.data["custom_whitelist"])
\ No newline at end of file